@@ -1,130 +1,249 @@
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
+import base64
+import glob
+import hashlib
 import os
+import string
+import sys
+from io import BytesIO
 
 # Define the directory for saving assets
 assets_dir = "/home/ubuntu/dashboard_assets"
 csv_file_path = "/home/ubuntu/upload/Time_series(2025.02.10-2025.05.06).csv"
 
-# Create the assets directory if it doesn't exist
-if not os.path.exists(assets_dir):
-    os.makedirs(assets_dir)
+# Charts in dashboard order: (name, column, color, plot title, y-axis label, card heading, alt text)
+CHARTS = [
+    ('clicks_over_time', 'Clicks', 'b', 'Daily Clicks Over Time', 'Clicks', 'Daily Clicks', 'Clicks Over Time'),
+    ('impressions_over_time', 'Impressions', 'g', 'Daily Impressions Over Time', 'Impressions', 'Daily Impressions', 'Impressions Over Time'),
+    ('cost_over_time', 'Cost', 'r', 'Daily Cost Over Time', 'Cost ($)', 'Daily Cost', 'Cost Over Time'),
+    ('avg_cpc_over_time', 'Avg. CPC', 'purple', 'Average CPC Over Time', 'Avg. CPC ($)', 'Average CPC', 'Average CPC Over Time'),
+    ('ctr_over_time', 'CTR', 'orange', 'Click-Through Rate (CTR) Over Time', 'CTR (%)', 'Click-Through Rate (CTR)', 'CTR Over Time'),
+    ('cpm_over_time', 'CPM', 'teal', 'Cost Per Mille (CPM) Over Time', 'CPM ($)', 'Cost Per Mille (CPM)', 'CPM Over Time'),
+]
 
-# Load the data
-df = pd.read_csv(csv_file_path)
+# x-axis date format shared by every chart
+DATE_FORMAT = '%Y-%m-%d'
 
-# Preprocess data
-# Convert 'Date' to datetime objects
-# Corrected format string: The CSV parser handles the quotes, so the format string should match the content *inside* the quotes.
-df['Date'] = pd.to_datetime(df['Date'], format='%a, %b %d, %Y')
+# Charts are shown at ~600px wide, so render at a lower DPI and favor PNG encode speed over file size
+CHART_DPI = 90
+PNG_OPTIONS = {'compress_level': 1, 'optimize': False}
 
-# Clean numeric columns (remove '$', ',', and convert to float)
-for col in ['Avg. CPC', 'Cost']:
-    df[col] = df[col].astype(str).str.replace("\n", "", regex=False).str.replace("$", "", regex=False).str.replace(",", "", regex=False).astype(float)
+# Bump whenever load_and_clean's output (columns or dtypes) changes, so older Feather caches are ignored
+CACHE_VERSION = 2
 
-df['Impressions'] = df['Impressions'].astype(str).str.replace(",", "", regex=False).astype(int)
-df['Clicks'] = df['Clicks'].astype(int)
+# Output HTML file name per render mode
+HTML_FILES = {
+    'file': "marketing_dashboard.html",
+    'embedded': "marketing_dashboard_embedded.html",
+}
+
+
+def _money(value):
+    """Parses a currency cell such as "$1,234.56" (possibly with a trailing newline) into a float."""
+    return float(value.replace('$', '').replace(',', '').strip() or 0)
+
+
+def _int(value):
+    """Parses a count cell such as "1,234" into an int."""
+    return int(value.replace(',', '').strip() or 0)
+
+
+def load_and_clean(csv_path):
+    """Loads the exported time series CSV and returns a cleaned DataFrame with derived metrics."""
+    # Numeric columns are cleaned by converters and dates parsed while reading, so no post-processing pass is needed
+    # Corrected format string: The CSV parser handles the quotes, so the format string should match the content *inside* the quotes.
+    df = pd.read_csv(
+        csv_path,
+        converters={'Cost': _money, 'Avg. CPC': _money, 'Impressions': _int, 'Clicks': _int},
+        parse_dates=['Date'],
+        date_format='%a, %b %d, %Y',
+        cache_dates=True,
+        engine='c',
+    )
+
+    # Calculate derived metrics
+    # Days without impressions get 0 instead of dividing by zero
+    # Explicit float64 so a header-only export (object columns, no rows) still divides cleanly
+    imp = df['Impressions'].to_numpy(dtype='float64')
+    clk = df['Clicks'].to_numpy(dtype='float64')
+    cost = df['Cost'].to_numpy(dtype='float64')
+    has_imp = imp > 0
+    df['CTR'] = np.divide(clk, imp, out=np.zeros(len(df)), where=has_imp) * 100.0  # Click-Through Rate in %
+    df['CPM'] = np.divide(cost, imp, out=np.zeros(len(df)), where=has_imp) * 1000.0  # Cost Per Mille (Thousand Impressions)
+
+    # 32-bit columns are plenty for daily ad metrics; Cost stays float64 because its total is shown to the cent
+    return df.astype({'Clicks': 'int32', 'Impressions': 'int32', 'Avg. CPC': 'float32', 'CTR': 'float32', 'CPM': 'float32'})
+
+
+def _remove_if_present(path):
+    """Deletes path, ignoring the case where another render sharing the directory already removed it."""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def load_cached(csv_path, cache_dir):
+    """Returns load_and_clean(csv_path), reusing a Feather copy in cache_dir while the CSV's mtime and size are unchanged."""
+    # The prefix ties a cache file to this CSV and cleaning schema, so CSVs sharing cache_dir keep separate caches
+    path_hash = hashlib.sha1(os.path.abspath(csv_path).encode('utf-8')).hexdigest()[:12]
+    prefix = f"clean_v{CACHE_VERSION}_{path_hash}_"
+    stat = os.stat(csv_path)
+    cache_path = os.path.join(cache_dir, f"{prefix}{stat.st_mtime_ns}_{stat.st_size}.feather")
+    if os.path.exists(cache_path):
+        try:
+            return pd.read_feather(cache_path)
+        except ImportError:
+            pass
+        except (ValueError, OSError):
+            # Unreadable cache (e.g. left truncated by an older crash): drop it and re-parse
+            _remove_if_present(cache_path)
+
+    df = load_and_clean(csv_path)
+    # Write to a temp name and rename, so an interrupted run never leaves a truncated file under the cache key
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        df.reset_index(drop=True).to_feather(tmp_path)
+        os.replace(tmp_path, cache_path)
+    except ImportError:
+        # Feather needs pyarrow; without it the CSV is simply parsed on every run
+        return df
+    finally:
+        _remove_if_present(tmp_path)
+    for stale_path in glob.glob(os.path.join(cache_dir, f"{prefix}*.feather")):
+        if stale_path != cache_path:
+            _remove_if_present(stale_path)
+    return df
 
-# Calculate derived metrics
-# Added handling for division by zero resulting in inf/-inf
-df['CTR'] = (df['Clicks'] / df['Impressions']).replace([float('inf'), -float('inf')], 0).fillna(0) * 100  # Click-Through Rate in %
-df['CPM'] = (df['Cost'] / df['Impressions']).replace([float('inf'), -float('inf')], 0).fillna(0) * 1000  # Cost Per Mille (Thousand Impressions)
 
 # --- Generate Visualizations ---
-plt.style.use('seaborn-v0_8-whitegrid') # Using a seaborn style for better aesthetics
-
-def save_plot(fig, filename):
-    filepath = os.path.join(assets_dir, filename)
-    fig.savefig(filepath, bbox_inches='tight')
-    print(f"Saved plot: {filepath}")
-    plt.close(fig) # Close the figure to free memory
-
-# 1. Clicks Over Time
-fig1, ax1 = plt.subplots(figsize=(12, 6))
-ax1.plot(df['Date'], df['Clicks'], marker='o', linestyle='-', color='b')
-ax1.set_title('Daily Clicks Over Time', fontsize=16)
-ax1.set_xlabel('Date', fontsize=12)
-ax1.set_ylabel('Clicks', fontsize=12)
-ax1.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
-ax1.tick_params(axis='x', rotation=45)
-plt.grid(True)
-save_plot(fig1, 'clicks_over_time.png')
-
-# 2. Impressions Over Time
-fig2, ax2 = plt.subplots(figsize=(12, 6))
-ax2.plot(df['Date'], df['Impressions'], marker='o', linestyle='-', color='g')
-ax2.set_title('Daily Impressions Over Time', fontsize=16)
-ax2.set_xlabel('Date', fontsize=12)
-ax2.set_ylabel('Impressions', fontsize=12)
-ax2.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
-ax2.tick_params(axis='x', rotation=45)
-plt.grid(True)
-save_plot(fig2, 'impressions_over_time.png')
-
-# 3. Cost Over Time
-fig3, ax3 = plt.subplots(figsize=(12, 6))
-ax3.plot(df['Date'], df['Cost'], marker='o', linestyle='-', color='r')
-ax3.set_title('Daily Cost Over Time', fontsize=16)
-ax3.set_xlabel('Date', fontsize=12)
-ax3.set_ylabel('Cost ($)', fontsize=12)
-ax3.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
-ax3.tick_params(axis='x', rotation=45)
-plt.grid(True)
-save_plot(fig3, 'cost_over_time.png')
-
-# 4. Avg. CPC Over Time
-fig4, ax4 = plt.subplots(figsize=(12, 6))
-ax4.plot(df['Date'], df['Avg. CPC'], marker='o', linestyle='-', color='purple')
-ax4.set_title('Average CPC Over Time', fontsize=16)
-ax4.set_xlabel('Date', fontsize=12)
-ax4.set_ylabel('Avg. CPC ($)', fontsize=12)
-ax4.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
-ax4.tick_params(axis='x', rotation=45)
-plt.grid(True)
-save_plot(fig4, 'avg_cpc_over_time.png')
-
-# 5. CTR Over Time
-fig5, ax5 = plt.subplots(figsize=(12, 6))
-ax5.plot(df['Date'], df['CTR'], marker='o', linestyle='-', color='orange')
-ax5.set_title('Click-Through Rate (CTR) Over Time', fontsize=16)
-ax5.set_xlabel('Date', fontsize=12)
-ax5.set_ylabel('CTR (%)', fontsize=12)
-ax5.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
-ax5.tick_params(axis='x', rotation=45)
-plt.grid(True)
-save_plot(fig5, 'ctr_over_time.png')
-
-# 6. CPM Over Time
-fig6, ax6 = plt.subplots(figsize=(12, 6))
-ax6.plot(df['Date'], df['CPM'], marker='o', linestyle='-', color='teal')
-ax6.set_title('Cost Per Mille (CPM) Over Time', fontsize=16)
-ax6.set_xlabel('Date', fontsize=12)
-ax6.set_ylabel('CPM ($)', fontsize=12)
-ax6.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m-%d'))
-ax6.tick_params(axis='x', rotation=45)
-plt.grid(True)
-save_plot(fig6, 'cpm_over_time.png')
-
-# --- Generate KPI Scorecards (as text for now, to be embedded in HTML) ---
-total_clicks = df['Clicks'].sum()
-total_impressions = df['Impressions'].sum()
-total_cost = df['Cost'].sum()
-average_cpc_overall = (total_cost / total_clicks) if total_clicks > 0 else 0
-average_ctr_overall = (total_clicks / total_impressions) * 100 if total_impressions > 0 else 0
-average_cpm_overall = (total_cost / total_impressions) * 1000 if total_impressions > 0 else 0
-
-kpi_data = {
-    "Total Clicks": f"{total_clicks:,}",
-    "Total Impressions": f"{total_impressions:,}",
-    "Total Cost": f"${total_cost:,.2f}",
-    "Overall Avg. CPC": f"${average_cpc_overall:,.2f}",
-    "Overall Avg. CTR": f"{average_ctr_overall:,.2f}%",
-    "Overall Avg. CPM": f"${average_cpm_overall:,.2f}"
-}
+# Chart grid kept alive between render() calls so a long-running process redraws it instead of rebuilding it
+_chart_figure = None
+# Scratch buffer reused for every PNG encode
+_png_buffer = BytesIO()
+
+
+def _get_chart_figure():
+    """Returns the shared (fig, axes) chart grid, creating it on first use and clearing its panels on reuse."""
+    global _chart_figure
+    import matplotlib.pyplot as plt
+
+    if _chart_figure is None:
+        # One 3x2 grid of 12x6 inch panels: fonts, tick machinery and the Agg buffer are set up and rasterized once
+        fig, axes = plt.subplots(3, 2, figsize=(24, 18), dpi=CHART_DPI, layout='constrained')
+        fig.get_layout_engine().set(w_pad=0.2, h_pad=0.2)
+        _chart_figure = fig, axes
+    else:
+        fig, axes = _chart_figure
+        for ax in axes.flat:
+            ax.clear()
+            # Start the constrained layout from the gridspec positions again, not from where the last draw left
+            # each panel, so the same data always produces the same PNG bytes
+            ax.set_position(ax.get_subplotspec().get_position(fig))
+            ax.set_in_layout(True)
+    return _chart_figure
+
+
+def _encode_png(pixels, dpi):
+    """Encodes an RGBA pixel array as PNG bytes, reusing one module-level buffer (not thread-safe)."""
+    import matplotlib.pyplot as plt
+
+    _png_buffer.seek(0)
+    _png_buffer.truncate(0)
+    plt.imsave(_png_buffer, pixels, format='png', dpi=dpi, pil_kwargs=PNG_OPTIONS)
+    return _png_buffer.getvalue()
+
+
+def render_charts(df):
+    """Draws all CHARTS on one figure and returns a dict of chart name -> PNG bytes cropped to each subplot."""
+    # Matplotlib is imported here so importing this module (e.g. just for the KPIs) skips font and backend setup;
+    # Agg is selected explicitly to avoid probing for a GUI backend
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    import matplotlib.dates as mdates
+
+    plt.style.use('seaborn-v0_8-whitegrid') # Using a seaborn style for better aesthetics (grid is already on)
+    plt.rcParams['path.simplify'] = True
+    plt.rcParams['agg.path.chunksize'] = 10000
+    plt.rcParams['path.simplify_threshold'] = 1.0
+
+    date_fmt = mdates.DateFormatter(DATE_FORMAT)
+    # Plain day-precision numpy arrays skip Series unwrapping and unit inference in every plot call
+    dates = df['Date'].to_numpy().astype('datetime64[D]')
+    fig, axes = _get_chart_figure()
+    for ax, (name, col, color, title, ylabel, _, _) in zip(axes.flat, CHARTS):
+        # float32 halves what gets streamed into the plots; no per-point markers, so each series is one polyline
+        ax.plot(dates, df[col].to_numpy(dtype='float32'), linestyle='-', color=color, linewidth=1.5)
+        ax.set_title(title, fontsize=16)
+        ax.set_xlabel('Date', fontsize=12)
+        ax.set_ylabel(ylabel, fontsize=12)
+        ax.xaxis.set_major_formatter(date_fmt)
+        ax.tick_params(axis='x', rotation=45)
+
+    fig.canvas.draw()
+    renderer = fig.canvas.get_renderer()
+    pixels = np.asarray(fig.canvas.buffer_rgba())
+    height, width = pixels.shape[:2]
+
+    # Cut each panel out of the shared raster, padded like savefig(bbox_inches='tight')
+    pad = 0.1 * fig.dpi
+    pngs = {}
+    for ax, (name, *_) in zip(axes.flat, CHARTS):
+        bbox = ax.get_tightbbox(renderer).padded(pad)
+        x0, x1 = max(int(bbox.x0), 0), min(int(np.ceil(bbox.x1)), width)
+        # Display coordinates start at the bottom-left, pixel rows at the top
+        y0, y1 = max(height - int(np.ceil(bbox.y1)), 0), min(height - int(bbox.y0), height)
+        pngs[name] = _encode_png(pixels[y0:y1, x0:x1], fig.dpi)
+    return pngs
 
-# --- Assemble into an HTML Dashboard --- 
-html_content = """
+
+def emit_file(pngs, out_dir):
+    """Writes each rendered PNG to out_dir and returns a dict of chart name -> image src."""
+    image_src = {}
+    for name, png in pngs.items():
+        filename = f"{name}.png"
+        filepath = os.path.join(out_dir, filename)
+        with open(filepath, "wb") as f:
+            f.write(png)
+        print(f"Saved plot: {filepath}")
+        image_src[name] = filename
+    return image_src
+
+
+def emit_embedded(pngs):
+    """Encodes each rendered PNG as a data URI and returns a dict of chart name -> image src."""
+    image_src = {}
+    for name, png in pngs.items():
+        # base64 output is pure ASCII, so skip the UTF-8 decoder
+        image_src[name] = f"data:image/png;base64,{base64.b64encode(png).decode('ascii')}"
+        print(f"Generated base64 for {name}.png")
+    return image_src
+
+
+# --- Generate KPI Scorecards ---
+def compute_kpis(df):
+    """Returns the overall KPI scorecard values, formatted for display."""
+    # One float64 pass over all three columns; Cost is already float64 in the frame, so its total keeps every cent
+    total_clicks, total_impressions, total_cost = df[['Clicks', 'Impressions', 'Cost']].to_numpy(dtype='float64').sum(axis=0)
+    total_clicks, total_impressions = int(total_clicks), int(total_impressions)
+    average_cpc_overall = (total_cost / total_clicks) if total_clicks > 0 else 0
+    average_ctr_overall = (total_clicks / total_impressions) * 100 if total_impressions > 0 else 0
+    average_cpm_overall = (total_cost / total_impressions) * 1000 if total_impressions > 0 else 0
+
+    return {
+        "Total Clicks": f"{total_clicks:,}",
+        "Total Impressions": f"{total_impressions:,}",
+        "Total Cost": f"${total_cost:,.2f}",
+        "Overall Avg. CPC": f"${average_cpc_overall:,.2f}",
+        "Overall Avg. CTR": f"{average_ctr_overall:,.2f}%",
+        "Overall Avg. CPM": f"${average_cpm_overall:,.2f}"
+    }
+
+
+# --- Assemble into an HTML Dashboard ---
+DASHBOARD_TEMPLATE = string.Template("""
 <html>
 <head>
     <title>Marketing Insights Dashboard</title>
@@ -143,54 +262,68 @@ html_content = """
 </head>
 <body>
     <h1>Marketing Insights Dashboard - Marfinetz Plumbing Co.</h1>
-    
+
     <h2>Key Performance Indicators (Overall)</h2>
     <div class="kpi-container">
-"""
-for k, v in kpi_data.items():
-    html_content += f"""        <div class="kpi-card">
-            <h3>{k}</h3>
-            <p>{v}</p>
-        </div>
-"""
-html_content += """    </div>
+$kpi_cards    </div>
 
     <h2>Performance Trends</h2>
     <div class="dashboard-container">
-        <div class="chart-container">
-            <h3>Daily Clicks</h3>
-            <img src="clicks_over_time.png" alt="Clicks Over Time">
-        </div>
-        <div class="chart-container">
-            <h3>Daily Impressions</h3>
-            <img src="impressions_over_time.png" alt="Impressions Over Time">
-        </div>
-        <div class="chart-container">
-            <h3>Daily Cost</h3>
-            <img src="cost_over_time.png" alt="Cost Over Time">
-        </div>
-        <div class="chart-container">
-            <h3>Average CPC</h3>
-            <img src="avg_cpc_over_time.png" alt="Average CPC Over Time">
-        </div>
-        <div class="chart-container">
-            <h3>Click-Through Rate (CTR)</h3>
-            <img src="ctr_over_time.png" alt="CTR Over Time">
-        </div>
-        <div class="chart-container">
-            <h3>Cost Per Mille (CPM)</h3>
-            <img src="cpm_over_time.png" alt="CPM Over Time">
-        </div>
-    </div>
+$charts    </div>
 
 </body>
 </html>
-"""
+""")
+
+KPI_CARD_TEMPLATE = string.Template("""        <div class="kpi-card">
+            <h3>$label</h3>
+            <p>$value</p>
+        </div>
+""")
+
+CHART_CARD_TEMPLATE = string.Template("""        <div class="chart-container">
+            <h3>$heading</h3>
+            <img src="$src" alt="$alt">
+        </div>
+""")
+
+
+def build_html(kpi_data, image_src):
+    """Assembles the dashboard HTML from the KPI values and a dict of chart name -> image src."""
+    kpi_cards = "".join(KPI_CARD_TEMPLATE.substitute(label=k, value=v) for k, v in kpi_data.items())
+    charts = "".join(
+        CHART_CARD_TEMPLATE.substitute(heading=heading, src=image_src[name], alt=alt)
+        for name, _, _, _, _, heading, alt in CHARTS
+    )
+    return DASHBOARD_TEMPLATE.substitute(kpi_cards=kpi_cards, charts=charts)
+
+
+def render(mode="file", csv_path=csv_file_path, out_dir=assets_dir):
+    """Generates the dashboard from csv_path into out_dir.
+
+    mode is "file" (PNGs next to the HTML), "embedded" (PNGs inlined as base64)
+    or "both"; the CSV is parsed and each chart is rendered once regardless.
+    """
+    modes = list(HTML_FILES) if mode == "both" else [mode]
+    if any(m not in HTML_FILES for m in modes):
+        raise ValueError(f"Unknown render mode: {mode!r}")
+
+    # Create the assets directory if it doesn't exist
+    os.makedirs(out_dir, exist_ok=True)
+
+    df = load_cached(csv_path, out_dir)
+    kpi_data = compute_kpis(df)
+    pngs = render_charts(df)
+    for m in modes:
+        image_src = emit_file(pngs, out_dir) if m == 'file' else emit_embedded(pngs)
+        html_file_path = os.path.join(out_dir, HTML_FILES[m])
+        # The page is ASCII apart from any stray characters in the data, which become HTML entities
+        with open(html_file_path, "wb") as f:
+            f.write(build_html(kpi_data, image_src).encode('ascii', 'xmlcharrefreplace'))
+        print(f"HTML dashboard generated: {html_file_path}")
 
-html_file_path = os.path.join(assets_dir, "marketing_dashboard.html")
-with open(html_file_path, "w") as f:
-    f.write(html_content)
-print(f"HTML dashboard generated: {html_file_path}")
+    print("All visualizations and HTML dashboard generated successfully.")
 
-print("All visualizations and HTML dashboard generated successfully.")
 
+if __name__ == "__main__":
+    render(sys.argv[1] if len(sys.argv) > 1 else "file")